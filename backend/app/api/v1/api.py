@@ -1,8 +1,9 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import properties, users, auth
+from app.api.v1.endpoints import properties, users, auth, saved_searches
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(properties.router, prefix="/properties", tags=["properties"])
-api_router.include_router(users.router, prefix="/users", tags=["users"]) 
\ No newline at end of file
+api_router.include_router(users.router, prefix="/users", tags=["users"])
+api_router.include_router(saved_searches.router, prefix="/saved-searches", tags=["saved searches"]) 
\ No newline at end of file
@@ -1,9 +1,12 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import or_, and_
 
-from app.db.session import get_db
+from app.core.config import settings
+from app.db.session import get_db, SessionLocal
 from app.models.property import Property
 from app.models.user import User
 from app.schemas.property import (
@@ -13,7 +16,10 @@ from app.schemas.property import (
     PropertySearch
 )
 from app.api.v1.endpoints.auth import get_current_user
+from app.utils.export import iter_csv, iter_ndjson, gzip_stream
 from app.utils.ipfs import upload_to_ipfs
+from app.utils.search_matching import record_matches
+from app.utils.similarity import load_similarity_index, similarity_index
 from app.utils.sui import get_object
 
 router = APIRouter()
@@ -34,17 +40,11 @@ async def create_property(
     db.add(db_property)
     db.commit()
     db.refresh(db_property)
+    similarity_index.upsert(db_property)
     return db_property
 
-@router.get("/", response_model=List[PropertySchema])
-async def search_properties(
-    search: PropertySearch = Depends(),
-    db: Session = Depends(get_db)
-):
-    """Search for properties with filters"""
-    query = db.query(Property)
-    
-    # Apply filters
+def apply_search_filters(query, search: PropertySearch):
+    """Apply the filters and sorting of a PropertySearch to a Property query"""
     if search.query:
         query = query.filter(
             or_(
@@ -80,12 +80,82 @@ async def search_properties(
             sort_column = sort_column.desc()
         query = query.order_by(sort_column)
     
+    return query
+
+@router.get("/", response_model=List[PropertySchema])
+async def search_properties(
+    search: PropertySearch = Depends(),
+    db: Session = Depends(get_db)
+):
+    """Search for properties with filters"""
+    query = apply_search_filters(db.query(Property), search)
+    
     # Apply pagination
     skip = (search.page - 1) * search.limit
     query = query.offset(skip).limit(search.limit)
     
     return query.all()
 
+@router.get("/export")
+def export_properties(
+    search: PropertySearch = Depends(),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    compress: bool = False
+):
+    """Stream every property matching the search filters as NDJSON or CSV"""
+    fields = list(PropertySchema.model_fields)
+
+    # A dedicated session keeps the server-side cursor open for the whole
+    # response; the single streamed SELECT reads one consistent snapshot.
+    # The query runs and the first row is serialized before the response
+    # starts, so a bad search or an unreachable database fails the request
+    # instead of producing an empty 200.
+    db = SessionLocal()
+    try:
+        query = apply_search_filters(db.query(Property), search)
+        query = query.execution_options(
+            stream_results=True,
+            yield_per=settings.EXPORT_BATCH_SIZE
+        )
+        results = iter(query)
+        first = next(results, None)
+        first_row = None
+        if first is not None:
+            first_row = PropertySchema.model_validate(first).model_dump(mode="json")
+            db.expunge(first)
+    except Exception:
+        db.close()
+        raise
+
+    def iter_rows():
+        try:
+            if first_row is None:
+                return
+            yield first_row
+            for db_property in results:
+                yield PropertySchema.model_validate(db_property).model_dump(mode="json")
+                db.expunge(db_property)
+        finally:
+            db.close()
+
+    if format == "csv":
+        body = iter_csv(iter_rows(), fields)
+        media_type = "text/csv"
+    else:
+        body = iter_ndjson(iter_rows())
+        media_type = "application/x-ndjson"
+
+    filename = f"properties.{format}"
+    if compress:
+        # Served as a .gz file rather than with Content-Encoding, which
+        # clients would transparently undo before saving
+        body = gzip_stream(body)
+        filename += ".gz"
+        media_type = "application/gzip"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
 @router.get("/{property_id}", response_model=PropertySchema)
 async def get_property(
     property_id: int,
@@ -97,6 +167,34 @@ async def get_property(
         raise HTTPException(status_code=404, detail="Property not found")
     return db_property
 
+@router.get("/{property_id}/similar", response_model=List[PropertySchema])
+def get_similar_properties(
+    property_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """Get the properties most similar to a given property"""
+    db_property = db.query(Property).filter(Property.id == property_id).first()
+    if db_property is None:
+        raise HTTPException(status_code=404, detail="Property not found")
+    
+    index = load_similarity_index(db)
+    # Written by another worker, or outside these endpoints
+    if db_property.is_listed and property_id not in index:
+        index.upsert(db_property)
+    
+    similar_ids = index.similar(db_property, limit)
+    if not similar_ids:
+        return []
+    
+    # The index may be stale under several workers, so recheck listing status
+    similar = db.query(Property).filter(
+        Property.id.in_(similar_ids),
+        Property.is_listed == True
+    ).all()
+    by_id = {p.id: p for p in similar}
+    return [by_id[i] for i in similar_ids if i in by_id]
+
 @router.put("/{property_id}", response_model=PropertySchema)
 async def update_property(
     *,
@@ -119,6 +217,8 @@ async def update_property(
     db.add(db_property)
     db.commit()
     db.refresh(db_property)
+    similarity_index.upsert(db_property)
+    await run_in_threadpool(record_matches, db, db_property)
     return db_property
 
 @router.post("/{property_id}/images")
@@ -219,5 +319,7 @@ async def list_property(
     db_property.is_listed = True
     db.add(db_property)
     db.commit()
+    similarity_index.upsert(db_property)
+    await run_in_threadpool(record_matches, db, db_property)
     
     return {"status": "listed"} 
\ No newline at end of file
@@ -0,0 +1,77 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.models.saved_search import SavedSearch, SavedSearchMatch
+from app.models.user import User
+from app.schemas.saved_search import (
+    SavedSearch as SavedSearchSchema,
+    SavedSearchCreate,
+    SavedSearchMatch as SavedSearchMatchSchema
+)
+from app.api.v1.endpoints.auth import get_current_user
+from app.utils.search_matching import search_matcher
+
+router = APIRouter()
+
+@router.post("/", response_model=SavedSearchSchema)
+async def create_saved_search(
+    *,
+    db: Session = Depends(get_db),
+    saved_search_in: SavedSearchCreate,
+    current_user: User = Depends(get_current_user)
+):
+    """Save a property search to be alerted about new matching listings"""
+    db_saved_search = SavedSearch(
+        name=saved_search_in.name,
+        criteria=saved_search_in.criteria.dict(exclude_none=True),
+        user_id=current_user.id
+    )
+    db.add(db_saved_search)
+    db.commit()
+    db.refresh(db_saved_search)
+    search_matcher.add(db_saved_search)
+    return db_saved_search
+
+@router.get("/", response_model=List[SavedSearchSchema])
+async def list_saved_searches(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List the current user's saved searches"""
+    return db.query(SavedSearch).filter(SavedSearch.user_id == current_user.id).all()
+
+@router.get("/matches", response_model=List[SavedSearchMatchSchema])
+async def list_saved_search_matches(
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List new listings that matched the current user's saved searches"""
+    return (
+        db.query(SavedSearchMatch)
+        .filter(SavedSearchMatch.user_id == current_user.id)
+        .order_by(SavedSearchMatch.created_at.desc())
+        .limit(limit)
+        .all()
+    )
+
+@router.delete("/{saved_search_id}")
+async def delete_saved_search(
+    saved_search_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Delete a saved search"""
+    db_saved_search = db.query(SavedSearch).filter(SavedSearch.id == saved_search_id).first()
+    if db_saved_search is None:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    if db_saved_search.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    db.delete(db_saved_search)
+    db.commit()
+    search_matcher.remove(saved_search_id)
+    
+    return {"status": "deleted"}
@@ -43,6 +43,9 @@ class Settings(BaseSettings):
     SUI_RPC_URL: str = "https://fullnode.testnet.sui.io:443"
     SUI_NETWORK: str = "testnet"
 
+    # Export
+    EXPORT_BATCH_SIZE: int = 1000  # rows fetched per server-side cursor round trip
+
     class Config:
         case_sensitive = True
         env_file = ".env"
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class SavedSearch(Base):
+    __tablename__ = "saved_searches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String)
+    criteria = Column(JSON)  # PropertyFilters fields
+    
+    # Metadata
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    user = relationship("User", back_populates="saved_searches")
+
+class SavedSearchMatch(Base):
+    __tablename__ = "saved_search_matches"
+
+    saved_search_id = Column(Integer, ForeignKey("saved_searches.id", ondelete="CASCADE"), primary_key=True)
+    property_id = Column(Integer, ForeignKey("properties.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    
+    # Metadata
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
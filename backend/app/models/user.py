@@ -26,4 +26,5 @@ class User(Base):
     
     # Relationships
     properties = relationship("Property", back_populates="owner")
-    favorites = relationship("Property", secondary="user_favorites") 
\ No newline at end of file
+    favorites = relationship("Property", secondary="user_favorites")
+    saved_searches = relationship("SavedSearch", back_populates="user") 
\ No newline at end of file
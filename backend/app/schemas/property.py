@@ -46,7 +46,7 @@ class PropertyInDB(PropertyBase):
 class Property(PropertyInDB):
     pass
 
-class PropertySearch(BaseModel):
+class PropertyFilters(BaseModel):
     query: Optional[str] = None
     min_price: Optional[float] = None
     max_price: Optional[float] = None
@@ -57,6 +57,8 @@ class PropertySearch(BaseModel):
     max_area: Optional[float] = None
     location: Optional[str] = None
     is_listed: Optional[bool] = None
+
+class PropertySearch(PropertyFilters):
     sort_by: Optional[str] = "created_at"
     sort_order: Optional[str] = "desc"
     page: int = Field(default=1, ge=1)
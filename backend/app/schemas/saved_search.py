@@ -0,0 +1,35 @@
+import re
+from pydantic import BaseModel, validator
+from datetime import datetime
+
+from app.schemas.property import PropertyFilters
+
+class SavedSearchBase(BaseModel):
+    name: str
+    criteria: PropertyFilters
+
+class SavedSearchCreate(SavedSearchBase):
+    @validator("criteria")
+    def query_has_words(cls, v: PropertyFilters) -> PropertyFilters:
+        if v.query and not re.search(r"\w", v.query):
+            raise ValueError("query must contain at least one word")
+        return v
+
+class SavedSearchInDB(SavedSearchBase):
+    id: int
+    user_id: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class SavedSearch(SavedSearchInDB):
+    pass
+
+class SavedSearchMatch(BaseModel):
+    saved_search_id: int
+    property_id: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
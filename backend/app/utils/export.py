@@ -0,0 +1,46 @@
+import csv
+import io
+import json
+import zlib
+from typing import Any, Iterable, Iterator, List
+
+def iter_ndjson(rows: Iterable[dict]) -> Iterator[bytes]:
+    """Encode rows as newline-delimited JSON, one line per row"""
+    for row in rows:
+        yield (json.dumps(row, default=str) + "\n").encode("utf-8")
+
+def iter_csv(rows: Iterable[dict], fieldnames: List[str]) -> Iterator[bytes]:
+    """Encode rows as CSV, writing the header before the first row"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({key: _csv_value(row.get(key)) for key in fieldnames})
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+    # Header only, when nothing matched
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+def gzip_stream(chunks: Iterable[bytes], flush_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Gzip-compress a byte stream on the fly"""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    pending = 0
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        pending += len(chunk)
+        if data:
+            yield data
+        # Push compressed bytes out regularly so the client sees progress
+        if pending >= flush_size:
+            data = compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+            if data:
+                yield data
+    yield compressor.flush()
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
@@ -0,0 +1,329 @@
+import math
+import re
+from bisect import bisect_right
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import literal, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models.saved_search import SavedSearch, SavedSearchMatch
+
+# Rows fetched per server-side cursor round trip when loading the matcher
+LOAD_BATCH_SIZE = 1000
+# Seconds between reconciliations with the saved_searches table
+REFRESH_INTERVAL = 30.0
+TOKEN_RE = re.compile(r"\w+")
+# Rebuild an interval tree once this many inserts are waiting in its buffer
+REBUILD_THRESHOLD = 1024
+# Check ranges per candidate instead of stabbing a tree holding this many times more
+DIRECT_CHECK_RATIO = 16
+
+def tokenize(text: Optional[str]) -> Set[str]:
+    return set(TOKEN_RE.findall((text or "").lower()))
+
+class _Node:
+    __slots__ = ("center", "starts", "start_keys", "ends", "end_keys", "left", "right")
+
+    def __init__(self, center, here, left, right):
+        self.center = center
+        by_start = sorted(here, key=lambda item: item[0])
+        self.starts = [item[0] for item in by_start]
+        self.start_keys = [item[2] for item in by_start]
+        # Negated ends, so both lists are ascending for bisect
+        by_end = sorted(here, key=lambda item: -item[1])
+        self.ends = [-item[1] for item in by_end]
+        self.end_keys = [item[2] for item in by_end]
+        self.left = left
+        self.right = right
+
+class IntervalTree:
+    """Centered interval tree answering "which intervals contain x".
+
+    New intervals are buffered and the tree is rebuilt once the buffer
+    grows past REBUILD_THRESHOLD; removals are tombstoned until then.
+    """
+
+    def __init__(self):
+        self._intervals: Dict[int, Tuple[float, float]] = {}
+        self._root: Optional[_Node] = None
+        self._pending: Dict[int, Tuple[float, float]] = {}
+        self._removed: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def add(self, key: int, low: float, high: float, defer: bool = False) -> None:
+        self.remove(key)
+        self._intervals[key] = (low, high)
+        self._pending[key] = (low, high)
+        if not defer and len(self._pending) > REBUILD_THRESHOLD:
+            self.rebuild()
+
+    def remove(self, key: int) -> None:
+        if self._intervals.pop(key, None) is None:
+            return
+        if self._pending.pop(key, None) is None:
+            self._removed.add(key)
+
+    def rebuild(self) -> None:
+        # Empty ranges (low > high) can never contain a point
+        items = [(low, high, key) for key, (low, high) in self._intervals.items() if low <= high]
+        self._root = self._build(items)
+        self._pending.clear()
+        self._removed.clear()
+
+    def _build(self, items: List[Tuple[float, float, int]]) -> Optional[_Node]:
+        if not items:
+            return None
+        # Median of the finite endpoints keeps the tree balanced with open ranges
+        points = sorted(p for low, high, _ in items for p in (low, high) if math.isfinite(p))
+        center = points[len(points) // 2] if points else 0.0
+        left, right, here = [], [], []
+        for item in items:
+            if item[1] < center:
+                left.append(item)
+            elif item[0] > center:
+                right.append(item)
+            else:
+                here.append(item)
+        return _Node(center, here, self._build(left), self._build(right))
+
+    def contains(self, key: int, x: float) -> bool:
+        low, high = self._intervals[key]
+        return low <= x <= high
+
+    def stab(self, x: float) -> Set[int]:
+        """Return the keys of all intervals containing x"""
+        result = set()
+        node = self._root
+        while node is not None:
+            if x < node.center:
+                result.update(node.start_keys[:bisect_right(node.starts, x)])
+                node = node.left
+            else:
+                result.update(node.end_keys[:bisect_right(node.ends, -x)])
+                node = node.right
+        if self._removed:
+            result -= self._removed
+        for key, (low, high) in self._pending.items():
+            if low <= x <= high:
+                result.add(key)
+        return result
+
+class SearchMatcher:
+    """Index of saved searches for matching new or updated listings.
+
+    Price and area ranges live in interval trees, property_type and bedroom
+    filters in hash buckets and keyword queries under their tokens. A listing
+    is matched by intersecting the candidate sets, smallest first, and the
+    remaining predicates are checked on the survivors. Keyword queries match
+    on whole words rather than the substring match used by search_properties.
+
+    The matcher is per-process. Searches saved or deleted through another
+    worker are picked up when the matcher next reconciles with the database,
+    at most REFRESH_INTERVAL seconds later.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._criteria: Dict[int, dict] = {}
+        self._price = IntervalTree()
+        self._area = IntervalTree()
+        self._by_type: Dict[Optional[str], Set[int]] = {}
+        self._by_bedrooms: Dict[Optional[int], Set[int]] = {}
+        self._by_token: Dict[Optional[str], Set[int]] = {}
+        self._refreshed_at = 0.0
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._criteria)
+
+    def load(self, saved_searches: Iterable) -> None:
+        """Bulk-load saved searches once and mark the index as ready"""
+        with self._load_lock:
+            if self.loaded:
+                return
+            rows = [(saved_search.id, saved_search.criteria) for saved_search in saved_searches]
+            with self._lock:
+                for key, criteria in rows:
+                    self._add(key, criteria, defer=True)
+                self._price.rebuild()
+                self._area.rebuild()
+            self._refreshed_at = time.monotonic()
+            self.loaded = True
+
+    def stale(self) -> bool:
+        return time.monotonic() - self._refreshed_at >= REFRESH_INTERVAL
+
+    def refresh(self, live_ids: Iterable, fetch: Callable[[List[int]], Iterable]) -> None:
+        """Reconcile with the saved searches that currently exist.
+
+        live_ids yields rows with the id of every saved search; fetch loads
+        the rows for the given ids. Searches missing here are added and
+        searches no longer in the database are dropped.
+        """
+        with self._load_lock:
+            if not self.stale():
+                return
+            # Searches added after this point may not be in live_ids yet
+            with self._lock:
+                known = set(self._criteria)
+            live = {row.id for row in live_ids}
+            missing = sorted(live - known)
+            rows = [(row.id, row.criteria) for row in fetch(missing)] if missing else []
+            with self._lock:
+                for key in known - live:
+                    self._remove(key)
+                for key, criteria in rows:
+                    self._add(key, criteria)
+            self._refreshed_at = time.monotonic()
+
+    def add(self, saved_search) -> None:
+        with self._lock:
+            self._add(saved_search.id, saved_search.criteria)
+
+    def remove(self, saved_search_id: int) -> None:
+        with self._lock:
+            self._remove(saved_search_id)
+
+    def _add(self, key: int, criteria: Optional[dict], defer: bool = False) -> None:
+        criteria = criteria or {}
+        self._remove(key)
+        self._criteria[key] = criteria
+
+        self._price.add(key, *_bounds(criteria, "min_price", "max_price"), defer=defer)
+        self._area.add(key, *_bounds(criteria, "min_area", "max_area"), defer=defer)
+        self._by_type.setdefault(criteria.get("property_type") or None, set()).add(key)
+        self._by_bedrooms.setdefault(criteria.get("bedrooms") or None, set()).add(key)
+        self._by_token.setdefault(_index_token(criteria), set()).add(key)
+
+    def _remove(self, key: int) -> None:
+        criteria = self._criteria.pop(key, None)
+        if criteria is None:
+            return
+        self._price.remove(key)
+        self._area.remove(key)
+        self._by_type[criteria.get("property_type") or None].discard(key)
+        self._by_bedrooms[criteria.get("bedrooms") or None].discard(key)
+        self._by_token[_index_token(criteria)].discard(key)
+
+    def match(self, prop) -> List[int]:
+        """Return the ids of saved searches matching a property"""
+        tokens = tokenize(prop.title) | tokenize(prop.description) | tokenize(prop.location)
+        with self._lock:
+            by_type = self._by_type.get(prop.property_type, set()) | self._by_type.get(None, set())
+            by_bedrooms = self._by_bedrooms.get(prop.bedrooms, set()) | self._by_bedrooms.get(None, set())
+            by_token = set(self._by_token.get(None, set()))
+            for token in tokens:
+                by_token |= self._by_token.get(token, set())
+
+            candidates = sorted([by_type, by_bedrooms, by_token], key=len)
+            result = candidates[0]
+            for other in candidates[1:]:
+                if not result:
+                    return []
+                result = result & other
+            for tree, value, bounds in (
+                (self._price, prop.price, ("min_price", "max_price")),
+                (self._area, prop.area, ("min_area", "max_area")),
+            ):
+                if not result:
+                    return []
+                if value is None:
+                    # Only searches without this range can match a missing value
+                    result = {
+                        key for key in result
+                        if _bounds(self._criteria[key], *bounds) == (-math.inf, math.inf)
+                    }
+                elif len(result) * DIRECT_CHECK_RATIO < len(tree):
+                    # Hash buckets already narrowed things down; check directly
+                    result = {key for key in result if tree.contains(key, value)}
+                else:
+                    result &= tree.stab(value)
+
+            return sorted(
+                key for key in result
+                if _matches_remaining(self._criteria[key], prop, tokens)
+            )
+
+def _bounds(criteria: dict, low_key: str, high_key: str) -> Tuple[float, float]:
+    low = criteria.get(low_key)
+    high = criteria.get(high_key)
+    return (
+        -math.inf if low is None else float(low),
+        math.inf if high is None else float(high),
+    )
+
+def _index_token(criteria: dict) -> Optional[str]:
+    # Index under the longest token, which tends to be the most selective
+    tokens = tokenize(criteria.get("query"))
+    if not tokens:
+        return None
+    return max(sorted(tokens), key=len)
+
+def _matches_remaining(criteria: dict, prop, tokens: Set[str]) -> bool:
+    query = criteria.get("query")
+    if query:
+        # A query without any word, such as "!!!", can never match
+        query_tokens = tokenize(query)
+        if not query_tokens or not query_tokens <= tokens:
+            return False
+    if criteria.get("bathrooms") and criteria["bathrooms"] != prop.bathrooms:
+        return False
+    location = criteria.get("location")
+    if location and location.lower() not in (prop.location or "").lower():
+        return False
+    is_listed = criteria.get("is_listed")
+    if is_listed is not None and is_listed != bool(prop.is_listed):
+        return False
+    return True
+
+search_matcher = SearchMatcher()
+
+def load_search_matcher(db) -> SearchMatcher:
+    """Populate the saved search matcher on first use and keep it reconciled"""
+    if not search_matcher.loaded:
+        search_matcher.load(
+            db.query(SavedSearch.id, SavedSearch.criteria).execution_options(
+                stream_results=True,
+                yield_per=LOAD_BATCH_SIZE
+            )
+        )
+    elif search_matcher.stale():
+        search_matcher.refresh(
+            db.query(SavedSearch.id).execution_options(
+                stream_results=True,
+                yield_per=LOAD_BATCH_SIZE
+            ),
+            lambda ids: db.query(SavedSearch.id, SavedSearch.criteria).filter(SavedSearch.id.in_(ids))
+        )
+    return search_matcher
+
+def record_matches(db, prop) -> int:
+    """Store alerts for the saved searches a listed property newly matches.
+
+    Drafts are skipped, so the alert fires when a property goes on sale.
+    Matches are keyed on (saved_search_id, property_id), so a listing that
+    is edited again does not alert the same search twice. Owners are read
+    from saved_searches in the same statement, which also drops searches
+    deleted since the matcher saw them.
+
+    This runs blocking database work, so async endpoints should call it
+    through run_in_threadpool.
+    """
+    if not prop.is_listed:
+        return 0
+    matched = load_search_matcher(db).match(prop)
+    if not matched:
+        return 0
+    statement = insert(SavedSearchMatch).from_select(
+        ["saved_search_id", "user_id", "property_id"],
+        select(SavedSearch.id, SavedSearch.user_id, literal(prop.id))
+        .where(SavedSearch.id.in_(matched))
+    ).on_conflict_do_nothing()
+    result = db.execute(statement)
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,266 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.property import Property
+
+# Rows fetched per server-side cursor round trip when loading the index
+LOAD_BATCH_SIZE = 1000
+# Numeric features: log price, log area, bedrooms, bathrooms
+N_FEATURES = 4
+# Distance added when two properties are in a different location
+LOCATION_PENALTY = 1.0
+# Width of a price band, in log1p(price) units
+BAND_WIDTH = 0.05
+
+def _features(prop) -> np.ndarray:
+    return _feature_matrix(
+        [prop.price or 0.0], [prop.area or 0.0], [prop.bedrooms or 0], [prop.bathrooms or 0]
+    )[0]
+
+def _feature_matrix(price, area, bedrooms, bathrooms) -> np.ndarray:
+    matrix = np.empty((len(price), N_FEATURES), dtype=np.float64)
+    matrix[:, 0] = np.log1p(np.maximum(np.array(price, dtype=np.float64), 0.0))
+    matrix[:, 1] = np.log1p(np.maximum(np.array(area, dtype=np.float64), 0.0))
+    matrix[:, 2] = bedrooms
+    matrix[:, 3] = bathrooms
+    return matrix
+
+def _band(log_price):
+    return np.floor_divide(log_price, BAND_WIDTH).astype(np.int64)
+
+def _location_key(prop) -> int:
+    return hash((prop.location or "").strip().lower())
+
+class _Bucket:
+    """Growable feature matrix for one price band of one property type"""
+
+    def __init__(self, capacity: int = 1024):
+        self.matrix = np.empty((capacity, N_FEATURES), dtype=np.float64)
+        self.locations = np.empty(capacity, dtype=np.int64)
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.size = 0
+
+    def _reserve(self, extra: int) -> None:
+        capacity = len(self.ids)
+        if self.size + extra <= capacity:
+            return
+        while capacity < self.size + extra:
+            capacity *= 2
+        self.matrix = np.resize(self.matrix, (capacity, N_FEATURES))
+        self.locations = np.resize(self.locations, capacity)
+        self.ids = np.resize(self.ids, capacity)
+
+    def append(self, property_id: int, features: np.ndarray, location: int) -> int:
+        self._reserve(1)
+        row = self.size
+        self.matrix[row] = features
+        self.locations[row] = location
+        self.ids[row] = property_id
+        self.size += 1
+        return row
+
+    def extend(self, ids: np.ndarray, matrix: np.ndarray, locations: np.ndarray) -> int:
+        """Append many rows at once; return the row of the first one"""
+        self._reserve(len(ids))
+        start, end = self.size, self.size + len(ids)
+        self.matrix[start:end] = matrix
+        self.locations[start:end] = locations
+        self.ids[start:end] = ids
+        self.size = end
+        return start
+
+    def remove(self, row: int) -> Optional[int]:
+        """Remove a row by moving the last row into its slot; return the moved id"""
+        last = self.size - 1
+        moved = None
+        if row != last:
+            self.matrix[row] = self.matrix[last]
+            self.locations[row] = self.locations[last]
+            self.ids[row] = self.ids[last]
+            moved = int(self.ids[row])
+        self.size -= 1
+        return moved
+
+class SimilarityIndex:
+    """In-memory nearest-neighbour index over listed properties.
+
+    Properties are partitioned by property_type and, within a type, by
+    log-price band, so a query only scores listings of the same type in the
+    bands around its price. Bands are visited in widening rings until the
+    price gap alone rules out the rest, which keeps results exact. Features
+    are z-score normalized with running column statistics, which keeps the
+    index incrementally updatable. Unlisted properties are kept out.
+
+    The index lives in process memory. With several workers, each one holds
+    its own copy and only sees the writes it handled itself after loading,
+    so results may be stale until the worker restarts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._buckets: Dict[Tuple[str, int], _Bucket] = {}
+        self._band_ranges: Dict[str, Tuple[int, int]] = {}
+        self._rows: Dict[int, Tuple[Tuple[str, int], int]] = {}
+        self._sum = np.zeros(N_FEATURES)
+        self._sumsq = np.zeros(N_FEATURES)
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, property_id: int) -> bool:
+        return property_id in self._rows
+
+    def load(self, properties: Iterable) -> None:
+        """Bulk-load listed properties once and mark the index as ready"""
+        with self._load_lock:
+            if self.loaded:
+                return
+            columns: Dict[str, Tuple[list, ...]] = {}
+            for prop in properties:
+                ids, price, area, bedrooms, bathrooms, locations = columns.setdefault(
+                    prop.property_type or "", ([], [], [], [], [], [])
+                )
+                ids.append(prop.id)
+                price.append(prop.price or 0.0)
+                area.append(prop.area or 0.0)
+                bedrooms.append(prop.bedrooms or 0)
+                bathrooms.append(prop.bathrooms or 0)
+                locations.append(_location_key(prop))
+
+            with self._lock:
+                for property_type, (ids, price, area, bedrooms, bathrooms, locations) in columns.items():
+                    ids = np.array(ids, dtype=np.int64)
+                    matrix = _feature_matrix(price, area, bedrooms, bathrooms)
+                    locations = np.array(locations, dtype=np.int64)
+                    # Rows upserted while loading are newer than the snapshot
+                    keep = np.array([i not in self._rows for i in ids.tolist()], dtype=bool)
+                    ids, matrix, locations = ids[keep], matrix[keep], locations[keep]
+
+                    bands = _band(matrix[:, 0])
+                    for band in np.unique(bands).tolist():
+                        in_band = bands == band
+                        key = (property_type, band)
+                        start = self._bucket(key).extend(ids[in_band], matrix[in_band], locations[in_band])
+                        for offset, property_id in enumerate(ids[in_band].tolist()):
+                            self._rows[property_id] = (key, start + offset)
+                    self._sum += matrix.sum(axis=0)
+                    self._sumsq += (matrix ** 2).sum(axis=0)
+            self.loaded = True
+
+    def upsert(self, prop) -> None:
+        """Add a listed property, refresh it after an update, or drop it once unlisted"""
+        features = _features(prop)
+        with self._lock:
+            self._remove(prop.id)
+            if not prop.is_listed:
+                return
+            key = (prop.property_type or "", int(_band(features[0])))
+            row = self._bucket(key).append(prop.id, features, _location_key(prop))
+            self._rows[prop.id] = (key, row)
+            self._sum += features
+            self._sumsq += features ** 2
+
+    def _bucket(self, key: Tuple[str, int]) -> _Bucket:
+        property_type, band = key
+        low, high = self._band_ranges.get(property_type, (band, band))
+        self._band_ranges[property_type] = (min(low, band), max(high, band))
+        return self._buckets.setdefault(key, _Bucket())
+
+    def _remove(self, property_id: int) -> None:
+        entry = self._rows.pop(property_id, None)
+        if entry is None:
+            return
+        key, row = entry
+        bucket = self._buckets[key]
+        features = bucket.matrix[row].copy()
+        self._sum -= features
+        self._sumsq -= features ** 2
+        moved = bucket.remove(row)
+        if moved is not None:
+            self._rows[moved] = (key, row)
+
+    def _scale(self) -> np.ndarray:
+        n = max(len(self._rows), 1)
+        variance = self._sumsq / n - (self._sum / n) ** 2
+        std = np.sqrt(np.maximum(variance, 0.0))
+        std[std == 0] = 1.0
+        return 1.0 / std
+
+    def _snapshot(self, property_type: str, bands: List[int]):
+        """Copy the given bands so they can be scored without the lock"""
+        parts = []
+        with self._lock:
+            for band in bands:
+                bucket = self._buckets.get((property_type, band))
+                if bucket is not None and bucket.size:
+                    size = bucket.size
+                    parts.append((
+                        bucket.ids[:size].copy(),
+                        bucket.matrix[:size].copy(),
+                        bucket.locations[:size].copy(),
+                    ))
+        return parts
+
+    def similar(self, prop, k: int = 10) -> List[int]:
+        """Return the ids of the k listed properties closest to the given one"""
+        property_type = prop.property_type or ""
+        features = _features(prop)
+        location = _location_key(prop)
+        band = int(_band(features[0]))
+        with self._lock:
+            if property_type not in self._band_ranges:
+                return []
+            low, high = self._band_ranges[property_type]
+            scale = self._scale()
+
+        best_ids = np.empty(0, dtype=np.int64)
+        best_distances = np.empty(0, dtype=np.float64)
+        ring = 0
+        while band - ring >= low or band + ring <= high:
+            bands = [band] if ring == 0 else [band - ring, band + ring]
+            for ids, matrix, locations in self._snapshot(property_type, bands):
+                diff = (matrix - features) * scale
+                distances = np.einsum("ij,ij->i", diff, diff)
+                distances += LOCATION_PENALTY * (locations != location)
+                distances[ids == prop.id] = np.inf
+                best_ids = np.concatenate([best_ids, ids])
+                best_distances = np.concatenate([best_distances, distances])
+                if len(best_ids) > k:
+                    nearest = np.argpartition(best_distances, k - 1)[:k]
+                    best_ids, best_distances = best_ids[nearest], best_distances[nearest]
+
+            # Bands in the next ring are at least this far away on price alone
+            gap = ring * BAND_WIDTH * scale[0]
+            if len(best_ids) >= k and gap * gap > best_distances.max():
+                break
+            ring += 1
+
+        found = np.isfinite(best_distances)
+        best_ids, best_distances = best_ids[found], best_distances[found]
+        order = np.argsort(best_distances, kind="stable")
+        return best_ids[order][:k].tolist()
+
+similarity_index = SimilarityIndex()
+
+def load_similarity_index(db) -> SimilarityIndex:
+    """Populate the similarity index from the database on first use"""
+    if not similarity_index.loaded:
+        similarity_index.load(
+            db.query(
+                Property.id,
+                Property.price,
+                Property.area,
+                Property.bedrooms,
+                Property.bathrooms,
+                Property.property_type,
+                Property.location
+            ).filter(Property.is_listed == True).execution_options(
+                stream_results=True,
+                yield_per=LOAD_BATCH_SIZE
+            )
+        )
+    return similarity_index
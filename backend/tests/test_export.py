@@ -0,0 +1,74 @@
+import csv
+import gzip
+import io
+import json
+import sys
+import types
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.utils.export import gzip_stream, iter_csv, iter_ndjson
+
+def test_iter_ndjson_writes_one_line_per_row():
+    rows = [{"id": 1, "images": ["a", "b"]}, {"id": 2, "title": "Flat"}]
+    lines = b"".join(iter_ndjson(rows)).decode().splitlines()
+
+    assert [json.loads(line) for line in lines] == rows
+
+def test_iter_ndjson_streams_row_by_row():
+    assert list(iter_ndjson([{"id": 1}, {"id": 2}])) == [b'{"id": 1}\n', b'{"id": 2}\n']
+
+def test_iter_csv_header_only_when_empty():
+    assert b"".join(iter_csv([], ["id", "title"])) == b"id,title\r\n"
+
+def test_iter_csv_encodes_lists_and_quotes():
+    rows = [
+        {"id": 1, "title": 'Big, "sunny" flat', "images": ["a", "b"], "extra": "dropped"},
+        {"id": 2, "title": "Line\nbreak", "images": []},
+    ]
+    chunks = list(iter_csv(rows, ["id", "title", "images"]))
+    assert len(chunks) == 2
+
+    parsed = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+    assert parsed == [
+        {"id": "1", "title": 'Big, "sunny" flat', "images": '["a", "b"]'},
+        {"id": "2", "title": "Line\nbreak", "images": "[]"},
+    ]
+
+def test_gzip_stream_round_trips():
+    chunks = [f"row {i}\n".encode() for i in range(10000)]
+    compressed = b"".join(gzip_stream(chunks))
+
+    assert gzip.decompress(compressed) == b"".join(chunks)
+
+def test_gzip_stream_flushes_periodically():
+    chunks = [bytes([i % 256]) * 1000 for i in range(100)]
+    output = list(gzip_stream(chunks, flush_size=10000))
+
+    # Every flush ends in the empty stored block that Z_SYNC_FLUSH emits
+    sync_flushes = [chunk for chunk in output[:-1] if chunk.endswith(b"\x00\x00\xff\xff")]
+    assert len(sync_flushes) == 10
+    # Each flushed prefix is decodable on its own
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert decompressor.decompress(b"".join(output[:2])) == b"".join(chunks[:10])
+
+@pytest.fixture
+def client(monkeypatch):
+    # app.utils.ipfs is still empty, so give the router something to import
+    ipfs = types.ModuleType("app.utils.ipfs")
+    ipfs.upload_to_ipfs = None
+    monkeypatch.setitem(sys.modules, "app.utils.ipfs", ipfs)
+    monkeypatch.delitem(sys.modules, "app.api.v1.endpoints.properties", raising=False)
+    from app.api.v1.endpoints import properties
+
+    app = FastAPI()
+    app.include_router(properties.router, prefix="/properties")
+    return TestClient(app, raise_server_exceptions=False)
+
+def test_export_with_bad_sort_fails_before_streaming(client):
+    response = client.get("/properties/export", params={"sort_by": "nope"})
+
+    assert response.status_code == 500
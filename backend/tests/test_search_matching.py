@@ -0,0 +1,256 @@
+import math
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import search_matching
+from app.utils.search_matching import IntervalTree, SearchMatcher
+
+def saved_search(id, **criteria):
+    return SimpleNamespace(id=id, user_id=1, criteria=criteria)
+
+def listing(**fields):
+    defaults = dict(
+        id=1,
+        title="Family house",
+        description="Quiet street",
+        location="Lagos",
+        price=100000.0,
+        area=120.0,
+        bedrooms=3,
+        bathrooms=2,
+        property_type="house",
+        is_listed=True,
+    )
+    defaults.update(fields)
+    return SimpleNamespace(**defaults)
+
+def random_interval(rng):
+    low = rng.choice([-math.inf, rng.uniform(0, 100)])
+    high = rng.choice([math.inf, rng.uniform(0, 100)])
+    return low, high
+
+def test_interval_tree_stab_matches_brute_force(monkeypatch):
+    monkeypatch.setattr(search_matching, "REBUILD_THRESHOLD", 16)
+    rng = random.Random(0)
+    tree = IntervalTree()
+    intervals = {}
+
+    for step in range(2000):
+        key = rng.randrange(300)
+        if rng.random() < 0.3:
+            tree.remove(key)
+            intervals.pop(key, None)
+        else:
+            intervals[key] = random_interval(rng)
+            tree.add(key, *intervals[key])
+        if step % 250 == 0:
+            tree.rebuild()
+
+        x = rng.uniform(-10, 110)
+        expected = {key for key, (low, high) in intervals.items() if low <= x <= high}
+        assert tree.stab(x) == expected
+    assert len(tree) == len(intervals)
+
+def test_interval_tree_includes_endpoints_and_skips_empty_ranges():
+    tree = IntervalTree()
+    tree.add(1, 10.0, 20.0)
+    tree.add(2, 30.0, 5.0)
+    tree.rebuild()
+
+    assert tree.stab(10.0) == {1}
+    assert tree.stab(20.0) == {1}
+    assert tree.stab(25.0) == set()
+
+def test_open_ranges():
+    matcher = SearchMatcher()
+    matcher.add(saved_search(1, min_price=50000))
+    matcher.add(saved_search(2, max_price=50000))
+    matcher.add(saved_search(3, min_area=100, max_area=150))
+    matcher.add(saved_search(4))
+
+    assert matcher.match(listing(price=100000.0, area=120.0)) == [1, 3, 4]
+    assert matcher.match(listing(price=50000.0, area=200.0)) == [1, 2, 4]
+
+def test_zero_bedrooms_matches_like_search_properties():
+    matcher = SearchMatcher()
+    matcher.add(saved_search(1, bedrooms=0))
+    matcher.add(saved_search(2, bedrooms=2))
+
+    assert matcher.match(listing(bedrooms=0)) == [1]
+    assert matcher.match(listing(bedrooms=2)) == [1, 2]
+
+def test_missing_price_or_area_only_matches_unbounded_searches():
+    matcher = SearchMatcher()
+    matcher.add(saved_search(1, min_price=1))
+    matcher.add(saved_search(2, max_area=500))
+    matcher.add(saved_search(3, property_type="house"))
+
+    assert matcher.match(listing(price=None)) == [2, 3]
+    assert matcher.match(listing(area=None)) == [1, 3]
+
+def test_multi_token_queries_need_every_word():
+    matcher = SearchMatcher()
+    matcher.add(saved_search(1, query="sea view"))
+    matcher.add(saved_search(2, query="Sea"))
+    matcher.add(saved_search(3, query="view garden"))
+
+    prop = listing(title="Sea view flat", description="Balcony", location="Accra")
+    assert matcher.match(prop) == [1, 2]
+    assert matcher.match(listing(title="Seaview")) == []
+
+def test_remaining_predicates():
+    matcher = SearchMatcher()
+    matcher.add(saved_search(1, location="lag"))
+    matcher.add(saved_search(2, bathrooms=3))
+    matcher.add(saved_search(3, is_listed=False))
+
+    assert matcher.match(listing(location="Lagos Island")) == [1]
+
+def test_add_replaces_and_remove_forgets():
+    matcher = SearchMatcher()
+    matcher.add(saved_search(1, property_type="land"))
+    assert matcher.match(listing()) == []
+
+    matcher.add(saved_search(1, property_type="house"))
+    assert matcher.match(listing()) == [1]
+
+    matcher.remove(1)
+    assert matcher.match(listing()) == []
+    assert len(matcher) == 0
+
+def test_load_runs_once():
+    matcher = SearchMatcher()
+    matcher.load([saved_search(1), saved_search(2, min_price=1)])
+    matcher.load([saved_search(3)])
+
+    assert len(matcher) == 2
+
+# A ratio of 0 always stabs the interval trees; a huge one always checks directly
+@pytest.mark.parametrize("direct_check_ratio", [0, 10 ** 9])
+@pytest.mark.parametrize("seed", range(3))
+def test_match_agrees_with_brute_force(monkeypatch, seed, direct_check_ratio):
+    monkeypatch.setattr(search_matching, "REBUILD_THRESHOLD", 64)
+    monkeypatch.setattr(search_matching, "DIRECT_CHECK_RATIO", direct_check_ratio)
+    rng = random.Random(seed)
+    types = ["house", "apartment", "land"]
+    words = ["sea", "view", "garden", "pool"]
+    searches = {}
+    matcher = SearchMatcher()
+
+    for key in range(3000):
+        criteria = {}
+        if rng.random() < 0.6:
+            criteria["min_price"] = rng.uniform(0, 8e5)
+        if rng.random() < 0.6:
+            criteria["max_price"] = rng.uniform(1e5, 1e6)
+        if rng.random() < 0.4:
+            criteria["min_area"] = rng.uniform(20, 200)
+        if rng.random() < 0.4:
+            criteria["max_area"] = rng.uniform(100, 400)
+        if rng.random() < 0.7:
+            criteria["property_type"] = rng.choice(types)
+        if rng.random() < 0.5:
+            criteria["bedrooms"] = rng.randint(1, 4)
+        if rng.random() < 0.4:
+            criteria["query"] = " ".join(rng.sample(words, rng.randint(1, 2)))
+        searches[key] = criteria
+        matcher.add(saved_search(key, **criteria))
+    for key in rng.sample(sorted(searches), 500):
+        del searches[key]
+        matcher.remove(key)
+
+    def expected(prop, tokens):
+        result = []
+        for key, c in sorted(searches.items()):
+            if c.get("min_price") is not None and prop.price < c["min_price"]:
+                continue
+            if c.get("max_price") is not None and prop.price > c["max_price"]:
+                continue
+            if c.get("min_area") is not None and prop.area < c["min_area"]:
+                continue
+            if c.get("max_area") is not None and prop.area > c["max_area"]:
+                continue
+            if c.get("property_type") and c["property_type"] != prop.property_type:
+                continue
+            if c.get("bedrooms") and c["bedrooms"] != prop.bedrooms:
+                continue
+            if not set(c.get("query", "").split()) <= tokens:
+                continue
+            result.append(key)
+        return result
+
+    for _ in range(50):
+        title = " ".join(rng.sample(words, rng.randint(0, 3)))
+        prop = listing(
+            price=rng.uniform(0, 1e6),
+            area=rng.uniform(20, 400),
+            property_type=rng.choice(types),
+            bedrooms=rng.randint(1, 4),
+            title=title,
+            description="",
+            location="",
+        )
+        assert matcher.match(prop) == expected(prop, set(title.split()))
+
+def test_queries_without_words_never_match():
+    matcher = SearchMatcher()
+    matcher.add(saved_search(1, query="!!!"))
+    matcher.add(saved_search(2, query="-"))
+    matcher.add(saved_search(3, query=""))
+
+    assert matcher.match(listing(title="a b", description="", location="Lagos")) == [3]
+
+def test_saved_search_create_rejects_queries_without_words():
+    from pydantic import ValidationError
+    from app.schemas.saved_search import SavedSearchCreate
+
+    with pytest.raises(ValidationError):
+        SavedSearchCreate(name="x", criteria={"query": "!!!"})
+    assert SavedSearchCreate(name="x", criteria={"query": "sea view"}).criteria.query == "sea view"
+    assert SavedSearchCreate(name="x", criteria={}).criteria.query is None
+
+def test_refresh_reconciles_with_database(monkeypatch):
+    matcher = SearchMatcher()
+    matcher.load([saved_search(1), saved_search(2)])
+    monkeypatch.setattr(search_matching, "REFRESH_INTERVAL", 0.0)
+
+    fetched = []
+    def fetch(ids):
+        fetched.append(ids)
+        # A search saved on this worker while the ids were being read
+        matcher.add(saved_search(9))
+        return [saved_search(3, property_type="house")]
+
+    live = [SimpleNamespace(id=1), SimpleNamespace(id=3)]
+    matcher.refresh(live, fetch)
+
+    assert fetched == [[3]]
+    assert matcher.match(listing()) == [1, 3, 9]
+
+class FakeSession:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(rowcount=1)
+
+    def commit(self):
+        pass
+
+def test_matches_are_recorded_when_listed_not_when_drafted(monkeypatch):
+    matcher = SearchMatcher()
+    matcher.load([saved_search(1, property_type="house"), saved_search(2, is_listed=True)])
+    monkeypatch.setattr(search_matching, "search_matcher", matcher)
+    db = FakeSession()
+
+    draft = listing(id=5, is_listed=False)
+    assert search_matching.record_matches(db, draft) == 0
+    assert db.statements == []
+
+    draft.is_listed = True
+    assert search_matching.record_matches(db, draft) == 1
+    statement = db.statements[0]
+    assert statement.select.whereclause.right.value == [1, 2]
@@ -0,0 +1,94 @@
+import random
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.utils import similarity
+from app.utils.similarity import SimilarityIndex
+
+def make_properties(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        SimpleNamespace(
+            id=i,
+            price=rng.uniform(1e4, 1e6),
+            area=rng.uniform(30, 400),
+            bedrooms=rng.randint(1, 5),
+            bathrooms=rng.randint(1, 3),
+            property_type=rng.choice(["house", "apartment"]),
+            location=rng.choice(["Lagos", "Abuja", "Accra"]),
+            is_listed=True,
+        )
+        for i in range(count)
+    ]
+
+def brute_force(index, properties, prop, k):
+    """Score every property of the same type, ignoring the band partitions"""
+    scale = index._scale()
+    candidates = [p for p in properties if p.property_type == prop.property_type and p.id != prop.id]
+    features = np.array([similarity._features(p) for p in candidates])
+    diff = (features - similarity._features(prop)) * scale
+    distances = (diff ** 2).sum(axis=1)
+    distances += similarity.LOCATION_PENALTY * np.array(
+        [similarity._location_key(p) != similarity._location_key(prop) for p in candidates]
+    )
+    order = np.argsort(distances, kind="stable")[:k]
+    return [candidates[i].id for i in order]
+
+def test_banded_search_is_exact():
+    properties = make_properties(3000)
+    index = SimilarityIndex()
+    index.load(properties)
+
+    for prop in properties[::61]:
+        for k in (1, 10, 50):
+            assert index.similar(prop, k) == brute_force(index, properties, prop, k)
+
+def test_bulk_load_matches_incremental_upserts():
+    properties = make_properties(2000)
+    loaded = SimilarityIndex()
+    loaded.load(properties)
+    incremental = SimilarityIndex()
+    for prop in properties:
+        incremental.upsert(prop)
+
+    for prop in properties[::37]:
+        assert loaded.similar(prop) == incremental.similar(prop)
+
+def test_load_runs_once_and_keeps_newer_upserts():
+    properties = make_properties(100)
+    index = SimilarityIndex()
+    updated = SimpleNamespace(**{**vars(properties[0]), "price": 1.0})
+    index.upsert(updated)
+    index.load(properties)
+    index.load(make_properties(500, seed=1))
+
+    assert len(index) == 100
+    reference = SimilarityIndex()
+    reference.load([updated] + properties[1:])
+    assert index.similar(updated) == reference.similar(updated)
+
+def test_similar_stays_within_property_type():
+    properties = make_properties(300)
+    index = SimilarityIndex()
+    index.load(properties)
+
+    similar = index.similar(properties[0], k=20)
+    assert len(similar) == 20
+    assert 0 not in similar
+    assert {properties[i].property_type for i in similar} == {properties[0].property_type}
+    assert index.similar(SimpleNamespace(**{**vars(properties[0]), "property_type": "land"})) == []
+
+def test_unlisted_properties_are_left_out():
+    properties = make_properties(50)
+    index = SimilarityIndex()
+    index.load(properties)
+    draft = SimpleNamespace(**{**vars(properties[1]), "id": 1000, "is_listed": False})
+    index.upsert(draft)
+    assert 1000 not in index
+
+    index.upsert(SimpleNamespace(**{**vars(properties[1]), "is_listed": False}))
+    assert 1 not in index
+    assert 1 not in index.similar(properties[0], k=49)
+    # An unlisted property can still be used as the query
+    assert len(index.similar(draft, k=5)) == 5